@@ -1,5 +1,7 @@
 import os
 import re
+import sys
+import json
 import subprocess
 from atlassian import Confluence
 import requests
@@ -8,11 +10,20 @@ import requests
 CONFLUENCE_URL = "https://REPLACEWITHYOURS.atlassian.net/wiki"
 CONFLUENCE_USER = "REPLACEWITHYOURS"
 CONFLUENCE_API_TOKEN = "REPLACEWITHYOURS"
-CONFLUENCE_SPACE_KEY = "RA""  # Your target space key
+CONFLUENCE_SPACE_KEY = "RA"  # Your target space key
 
 # === Local wiki export location ===
 wiki_dir = r"LOCATION OF DOWNLOADED WIKI"  # Use raw string to avoid escape issues
 
+# === Wiki title -> Confluence page ID index (one JSON line appended per page), used later by rewrite_cross_references.py ===
+confluence_page_map_file = "confluence_page_map.jsonl"
+
+# === Dry-run planning: convert every page without calling Confluence, then print a plan (or run with --dry-run) ===
+DRY_RUN = "--dry-run" in sys.argv
+CONFLUENCE_REQUESTS_PER_SECOND = 1.5    # Sustained request rate you expect Confluence to allow
+UPLOAD_BYTES_PER_SECOND = 1_000_000     # Expected upload throughput for page bodies and attachments
+confluence_plan_file = "confluence_migration_plan.json"
+
 # === Connect to Confluence ===
 confluence = Confluence(
     url=CONFLUENCE_URL,
@@ -69,6 +80,17 @@ def create_page_hierarchy(wiki_dir):
             }
     return hierarchy
 
+def build_page_body(info):
+    with open(info['file'], 'r', encoding='utf-8') as f:
+        raw_content = f.read()
+    split = raw_content.find('---\n\n')
+    if split != -1:
+        body = raw_content[split+5:]
+    else:
+        body = raw_content
+    html_body = textile_to_html_with_pandoc(body)
+    return html_replace_img_with_confluence_macro(html_body, info['attachments'] + info['images'])
+
 def get_page_id(title, space, parent_id=None):
     results = confluence.get_page_id(space, title)
     if results:
@@ -109,6 +131,11 @@ def upload_attachments_to_page(page_id, file_paths):
                 continue
 
 
+def record_page_mapping(title, page_id):
+    with open(confluence_page_map_file, 'a', encoding='utf-8') as f:
+        f.write(json.dumps({'title': title, 'page_id': str(page_id)}) + '\n')
+
+
 def create_confluence_wiki(wiki_dir, confluence_space):
     hierarchy = create_page_hierarchy(wiki_dir)
     created_pages = {}
@@ -116,15 +143,7 @@ def create_confluence_wiki(wiki_dir, confluence_space):
     # First, create all root pages (no parent)
     for title, info in hierarchy.items():
         if info['parent'] is None:
-            with open(info['file'], 'r', encoding='utf-8') as f:
-                raw_content = f.read()
-            split = raw_content.find('---\n\n')
-            if split != -1:
-                body = raw_content[split+5:]
-            else:
-                body = raw_content
-            html_body = textile_to_html_with_pandoc(body)
-            html_body = html_replace_img_with_confluence_macro(html_body, info['attachments'] + info['images'])
+            html_body = build_page_body(info)
             try:
                 created_page = confluence.create_page(
                     space=confluence_space,
@@ -135,6 +154,7 @@ def create_confluence_wiki(wiki_dir, confluence_space):
                 )
                 page_id = created_page['id'] if isinstance(created_page, dict) else created_page
                 created_pages[title] = page_id
+                record_page_mapping(title, page_id)
                 upload_attachments_to_page(page_id, info['attachments'] + info['images'])
             except Exception as e:
                 error_str = str(e)
@@ -146,6 +166,7 @@ def create_confluence_wiki(wiki_dir, confluence_space):
                         continue
                     else:
                         created_pages[title] = page_id
+                        record_page_mapping(title, page_id)
                         upload_attachments_to_page(page_id, info['attachments'] + info['images'])
                     continue
                 else:
@@ -159,15 +180,7 @@ def create_confluence_wiki(wiki_dir, confluence_space):
         for title, info in list(pages_remaining.items()):
             parent_title = info['parent']
             if parent_title in created_pages:
-                with open(info['file'], 'r', encoding='utf-8') as f:
-                    raw_content = f.read()
-                split = raw_content.find('---\n\n')
-                if split != -1:
-                    body = raw_content[split+5:]
-                else:
-                    body = raw_content
-                html_body = textile_to_html_with_pandoc(body)
-                html_body = html_replace_img_with_confluence_macro(html_body, info['attachments'] + info['images'])
+                html_body = build_page_body(info)
                 try:
                     created_page = confluence.create_page(
                         space=confluence_space,
@@ -178,6 +191,7 @@ def create_confluence_wiki(wiki_dir, confluence_space):
                     )
                     page_id = created_page['id'] if isinstance(created_page, dict) else created_page
                     created_pages[title] = page_id
+                    record_page_mapping(title, page_id)
                     upload_attachments_to_page(page_id, info['attachments'] + info['images'])
                     del pages_remaining[title]
                     progress = True
@@ -191,6 +205,7 @@ def create_confluence_wiki(wiki_dir, confluence_space):
                             continue
                         else:
                             created_pages[title] = page_id
+                            record_page_mapping(title, page_id)
                             upload_attachments_to_page(page_id, info['attachments'] + info['images'])
                             del pages_remaining[title]
                             progress = True
@@ -204,5 +219,61 @@ def create_confluence_wiki(wiki_dir, confluence_space):
         for k in pages_remaining:
             print(f"  - {k}")
 
+def plan_confluence_page(title, info):
+    html_body = build_page_body(info)
+    # Mirrors upload_attachments_to_page, which skips empty files
+    files = [f for f in info['attachments'] + info['images'] if os.path.getsize(f) > 0]
+    requests_count = 1 + len(files)
+    upload_bytes = len(html_body.encode('utf-8')) + sum(os.path.getsize(f) for f in files)
+    return {
+        'title': title,
+        'parent': info['parent'],
+        'requests': requests_count,
+        'upload_bytes': upload_bytes,
+        'estimated_seconds': round(
+            requests_count / CONFLUENCE_REQUESTS_PER_SECOND + upload_bytes / UPLOAD_BYTES_PER_SECOND, 2
+        ),
+    }
+
+def dry_run(wiki_dir):
+    hierarchy = create_page_hierarchy(wiki_dir)
+    plans = []
+
+    # Same placement order as create_confluence_wiki: root pages first, then children once their parent exists
+    placed = set()
+    pages_remaining = dict(hierarchy)
+    progress = True
+    while pages_remaining and progress:
+        progress = False
+        for title, info in list(pages_remaining.items()):
+            if info['parent'] is None or info['parent'] in placed:
+                plan = plan_confluence_page(title, info)
+                plans.append(plan)
+                print(f"📝 '{title}': {plan['requests']} requests, {plan['upload_bytes']} bytes")
+                placed.add(title)
+                del pages_remaining[title]
+                progress = True
+
+    totals = {
+        'pages': len(plans),
+        'requests': sum(p['requests'] for p in plans),
+        'upload_bytes': sum(p['upload_bytes'] for p in plans),
+        'unplaced_pages': sorted(pages_remaining),
+        'estimated_seconds': round(sum(p['estimated_seconds'] for p in plans), 2),
+    }
+    with open(confluence_plan_file, 'w', encoding='utf-8') as f:
+        json.dump({'totals': totals, 'pages': plans}, f, indent=2)
+    print(f"\n📊 Dry run: {totals['pages']} pages, {totals['requests']} requests, "
+          f"{totals['upload_bytes'] / 1_000_000:.1f} MB upload")
+    if pages_remaining:
+        print("⚠️ These pages would not be placed due to missing parent(s):")
+        for k in pages_remaining:
+            print(f"  - {k}")
+    print(f"⏱️ Estimated time: {totals['estimated_seconds'] / 3600:.2f} hours at "
+          f"{CONFLUENCE_REQUESTS_PER_SECOND} requests/s (plan saved to '{confluence_plan_file}')")
+
 if __name__ == "__main__":
-    create_confluence_wiki(wiki_dir, CONFLUENCE_SPACE_KEY)
+    if DRY_RUN:
+        dry_run(wiki_dir)
+    else:
+        create_confluence_wiki(wiki_dir, CONFLUENCE_SPACE_KEY)
@@ -2,6 +2,7 @@ import os
 import re
 import json
 import requests
+import sys
 import time
 import subprocess
 
@@ -14,6 +15,17 @@ JIRA_PROJECT_KEY = "KEY"  # Your target Jira project key
 # === Source Redmine issues (txt files for comments, description, and JSON of the issue)===
 redmine_issues_folder = r"LOCATION OF EXPORTED FILES"
 
+# === Redmine issue ID -> Jira key index (one JSON line appended per issue), used later by rewrite_cross_references.py ===
+jira_issue_map_file = "jira_issue_map.jsonl"
+
+# === Dry-run planning: build every payload without calling Jira, then print a plan (or run with --dry-run) ===
+DRY_RUN = "--dry-run" in sys.argv
+JIRA_REQUESTS_PER_SECOND = 1.5          # Sustained request rate you expect Jira to allow
+UPLOAD_BYTES_PER_SECOND = 1_000_000     # Expected upload throughput for payloads and attachments
+JIRA_DESCRIPTION_CHAR_LIMIT = 32767     # Heuristic: compact ADF JSON above this many characters is expected to hit CONTENT_LIMIT_EXCEEDED
+POLITE_DELAY = 0.6                      # Pause between issues in main()
+jira_plan_file = "jira_migration_plan.json"
+
 auth = (JIRA_USER, JIRA_API_TOKEN)
 
 # === Modify this mapping based on your priority mapping, "REDMINE" : "JIRA"===
@@ -136,30 +148,28 @@ def attach_file_to_jira(issue_key, file_path):
         else:
             print(f"   ⚠️ Failed to upload fallback file '{filename}': {resp.text}")
 
-def create_jira_issue(redmine_issue):
-    summary = redmine_issue.get('subject', 'No subject')
+def build_description_markdown(redmine_issue):
     description_textile = redmine_issue.get('description', '')
-    description_markdown = ""
     if description_textile:
         preprocessed = preprocess_redmine_plaintext(description_textile)
-        description_markdown = textile_to_markdown_with_pandoc(preprocessed)
-    else:
-        description_markdown = "No description."
+        return textile_to_markdown_with_pandoc(preprocessed)
+    return "No description."
 
+def summarize_markdown(description_markdown):
+    return description_markdown[:SUMMARY_CHAR_LIMIT] + ("..." if len(description_markdown) > SUMMARY_CHAR_LIMIT else "")
+
+def build_adf_content(redmine_issue, markdown):
     adf_content = []
     adf_content.append(adf_infobox("Migrated From bugs.RamSoft.com"))
-    adf_content.append(adf_metadata_table(redmine_issue))    
-    adf_content.extend(adf_paragraphs_from_markdown(description_markdown))
-
-    # Always attach the .txt and comments.txt for each issue
-    issue_id = redmine_issue.get('id')
-    txt_path = os.path.join(redmine_issues_folder, f"issue_{issue_id}.txt")
-    comments_txt_path = os.path.join(redmine_issues_folder, f"issue_{issue_id}_comments.txt")
+    adf_content.append(adf_metadata_table(redmine_issue))
+    adf_content.extend(adf_paragraphs_from_markdown(markdown))
+    return adf_content
 
-    # Prepare main Jira issue payload
+def build_issue_payload(redmine_issue, adf_content):
+    summary = redmine_issue.get('subject', 'No subject')
     priority = redmine_issue.get('priority', {}).get('name', 'Medium')
     priority_jira = priority_map.get(priority, "Medium")
-    payload = {
+    return {
         "fields": {
             "project": {"key": JIRA_PROJECT_KEY},
             "summary": summary,
@@ -173,6 +183,17 @@ def create_jira_issue(redmine_issue):
         }
     }
 
+def create_jira_issue(redmine_issue):
+    description_markdown = build_description_markdown(redmine_issue)
+
+    # Always attach the .txt and comments.txt for each issue
+    issue_id = redmine_issue.get('id')
+    txt_path = os.path.join(redmine_issues_folder, f"issue_{issue_id}.txt")
+    comments_txt_path = os.path.join(redmine_issues_folder, f"issue_{issue_id}_comments.txt")
+
+    # Prepare main Jira issue payload
+    payload = build_issue_payload(redmine_issue, build_adf_content(redmine_issue, description_markdown))
+
     resp = requests.post(
         f"{JIRA_URL}/rest/api/3/issue",
         auth=auth,
@@ -183,12 +204,8 @@ def create_jira_issue(redmine_issue):
     # Fallback: If description too long, only add metadata and summary
     if resp.status_code not in (200, 201) and "CONTENT_LIMIT_EXCEEDED" in resp.text:
         print(f"⚠️ Content limit exceeded, retrying with summary only for Redmine #{issue_id}")
-        summary_short = description_markdown[:SUMMARY_CHAR_LIMIT] + ("..." if len(description_markdown) > SUMMARY_CHAR_LIMIT else "")
-        adf_content_fallback = []
-        adf_content_fallback.append(adf_infobox("Migrated From bugs.RamSoft.com"))
-        adf_content_fallback.append(adf_metadata_table(redmine_issue))
-        adf_content_fallback.extend(adf_paragraphs_from_markdown(summary_short))
-        payload["fields"]["description"]["content"] = adf_content_fallback
+        summary_short = summarize_markdown(description_markdown)
+        payload["fields"]["description"]["content"] = build_adf_content(redmine_issue, summary_short)
         resp2 = requests.post(
             f"{JIRA_URL}/rest/api/3/issue",
             auth=auth,
@@ -238,19 +255,93 @@ def upload_attachments_to_jira(issue_key, attachment_folder):
             else:
                 print(f"   ⚠️ Failed to upload attachment '{filename}': {resp.text}")
 
+def record_issue_mapping(redmine_id, issue_key):
+    with open(jira_issue_map_file, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"redmine_id": str(redmine_id), "jira_key": issue_key}) + "\n")
+
+def payload_size(payload):
+    return len(json.dumps(payload).encode('utf-8'))
+
+def plan_jira_issue(redmine_issue):
+    issue_id = redmine_issue.get('id')
+    description_markdown = build_description_markdown(redmine_issue)
+    payload = build_issue_payload(redmine_issue, build_adf_content(redmine_issue, description_markdown))
+    requests_count = 1
+    upload_bytes = payload_size(payload)
+
+    # Mirrors create_jira_issue: an oversized description is rejected and resent as a summary
+    description_json = json.dumps(payload["fields"]["description"], ensure_ascii=False, separators=(',', ':'))
+    content_limit_exceeded = len(description_json) > JIRA_DESCRIPTION_CHAR_LIMIT
+    if content_limit_exceeded:
+        summary_short = summarize_markdown(description_markdown)
+        payload["fields"]["description"]["content"] = build_adf_content(redmine_issue, summary_short)
+        requests_count += 1
+        upload_bytes += payload_size(payload)
+
+    files = [
+        os.path.join(redmine_issues_folder, f"issue_{issue_id}.txt"),
+        os.path.join(redmine_issues_folder, f"issue_{issue_id}_comments.txt"),
+    ]
+    attachment_dir = os.path.join(redmine_issues_folder, f"issue_{issue_id}_attachments")
+    if os.path.exists(attachment_dir):
+        files += [os.path.join(attachment_dir, f) for f in os.listdir(attachment_dir)]
+    files = [f for f in files if os.path.exists(f)]
+    requests_count += len(files)
+    upload_bytes += sum(os.path.getsize(f) for f in files)
+
+    return {
+        "redmine_id": issue_id,
+        "requests": requests_count,
+        "upload_bytes": upload_bytes,
+        "content_limit_exceeded": content_limit_exceeded,
+        "estimated_seconds": round(
+            requests_count / JIRA_REQUESTS_PER_SECOND + upload_bytes / UPLOAD_BYTES_PER_SECOND + POLITE_DELAY, 2
+        ),
+    }
+
+def dry_run():
+    plans = []
+    for fname in sorted(os.listdir(redmine_issues_folder)):
+        if fname.endswith(".json"):
+            with open(os.path.join(redmine_issues_folder, fname), "r", encoding="utf-8") as f:
+                redmine_issue = json.load(f)
+            plan = plan_jira_issue(redmine_issue)
+            plans.append(plan)
+            fallback = " (CONTENT_LIMIT_EXCEEDED fallback)" if plan["content_limit_exceeded"] else ""
+            print(f"📝 Redmine #{plan['redmine_id']}: {plan['requests']} requests, {plan['upload_bytes']} bytes{fallback}")
+
+    totals = {
+        "issues": len(plans),
+        "requests": sum(p["requests"] for p in plans),
+        "upload_bytes": sum(p["upload_bytes"] for p in plans),
+        "content_limit_exceeded": sum(1 for p in plans if p["content_limit_exceeded"]),
+        "estimated_seconds": round(sum(p["estimated_seconds"] for p in plans), 2),
+    }
+    with open(jira_plan_file, "w", encoding="utf-8") as f:
+        json.dump({"totals": totals, "issues": plans}, f, indent=2)
+    print(f"\n📊 Dry run: {totals['issues']} issues, {totals['requests']} requests, "
+          f"{totals['upload_bytes'] / 1_000_000:.1f} MB upload, "
+          f"{totals['content_limit_exceeded']} expected CONTENT_LIMIT_EXCEEDED fallbacks")
+    print(f"⏱️ Estimated time: {totals['estimated_seconds'] / 3600:.2f} hours at "
+          f"{JIRA_REQUESTS_PER_SECOND} requests/s (plan saved to '{jira_plan_file}')")
+
 def main():
+    if DRY_RUN:
+        dry_run()
+        return
     for fname in os.listdir(redmine_issues_folder):
         if fname.endswith(".json"):
             with open(os.path.join(redmine_issues_folder, fname), "r", encoding="utf-8") as f:
                 redmine_issue = json.load(f)
             issue_key = create_jira_issue(redmine_issue)
             if issue_key:
+                record_issue_mapping(redmine_issue['id'], issue_key)
                 attachment_dir = os.path.join(
                     redmine_issues_folder, 
                     f"issue_{redmine_issue['id']}_attachments"
                 )
                 upload_attachments_to_jira(issue_key, attachment_dir)
-            time.sleep(0.6)  # Polite delay
+            time.sleep(POLITE_DELAY)  # Polite delay
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,325 @@
+import os
+import re
+import json
+import html
+import time
+import requests
+from atlassian import Confluence
+
+# === Jira configuration ===
+JIRA_URL = "https://DOMAIN.atlassian.net"
+JIRA_USER = "YOUR EMAIL"
+JIRA_API_TOKEN = "YOUR API KEY"
+JIRA_PROJECT_KEY = "KEY"  # Jira project the Redmine issues were imported into
+
+# === Confluence configuration ===
+CONFLUENCE_URL = "https://REPLACEWITHYOURS.atlassian.net/wiki"
+CONFLUENCE_USER = "REPLACEWITHYOURS"
+CONFLUENCE_API_TOKEN = "REPLACEWITHYOURS"
+CONFLUENCE_SPACE_KEY = "RA"  # Confluence space the Redmine wiki was imported into
+
+# === Link indexes written by import_to_jira.py and import_to_confluence.py ===
+jira_issue_map_file = "jira_issue_map.jsonl"
+confluence_page_map_file = "confluence_page_map.jsonl"
+
+PAGE_SIZE = 100  # Issues/pages fetched per search request
+
+auth = (JIRA_USER, JIRA_API_TOKEN)
+
+confluence = Confluence(
+    url=CONFLUENCE_URL,
+    username=CONFLUENCE_USER,
+    password=CONFLUENCE_API_TOKEN
+)
+
+# Precompiled patterns for the kinds of Redmine reference. Issue and wiki references are run as
+# separate passes so that issue references inside brackets (e.g. "[bug #1234]") are still found
+# when the brackets are not a wiki link.
+# ISSUE_PATTERN matches "#1234" (HTML entities are excluded here, words and URLs in iter_issue_matches).
+ISSUE_PATTERN = re.compile(r'(?<![&#\\])\\?#(?P<issue>\d+)\b')
+URL_PATTERN = re.compile(r'\b[a-zA-Z][a-zA-Z0-9+.-]*://\S+')
+# WIKI_LINK_PATTERN matches "[[Page]]", "[[Page|label]]" and "[[Page#anchor]]", as found in Confluence pages.
+WIKI_LINK_PATTERN = re.compile(r'\[\[(?P<page>[^\[\]\n]+?)\]\]')
+# JIRA_PAGE_PATTERN also accepts the "[Page]" form left behind by preprocess_redmine_plaintext, but not
+# markdown link syntax ("[text](url)", "[text][ref]"). Pandoc may have escaped the brackets with "\".
+JIRA_PAGE_PATTERN = re.compile(
+    r'(?<!\])\\?\[(?:\\?\[)?(?P<page>[^\[\]\n]+?)\\?\](?:\\?\])?(?![(\[\]])'
+)
+
+# Storage-format elements whose text must never be rewritten
+SKIP_TAGS = ('a', 'ac:link', 'ac:structured-macro', 'code', 'pre')
+
+
+def load_index(path, key_field, value_field):
+    if not os.path.exists(path):
+        print(f"⚠️ Link index '{path}' not found, its references will be left untouched.")
+        return {}
+    index = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                # Later lines win, so re-running an import simply refreshes its entries
+                index[record[key_field]] = record[value_field]
+    return index
+
+def normalize_wiki_title(title):
+    # Same sanitizing as export_redmine_wiki.py; Redmine treats spaces and underscores alike
+    title = re.sub(r'[<>:\"/\\|?*]', '_', title.strip())
+    return title.replace(' ', '_').lower()
+
+def build_link_index():
+    issue_map = load_index(jira_issue_map_file, 'redmine_id', 'jira_key')
+    page_map = load_index(confluence_page_map_file, 'title', 'page_id')
+    return {
+        'issues': {str(k): v for k, v in issue_map.items()},
+        'pages': {normalize_wiki_title(k): (k, v) for k, v in page_map.items()},
+        # Only migrated documents are rewritten; native issues/pages may use "#123" for other things
+        'jira_keys': set(issue_map.values()),
+        'page_ids': {str(v) for v in page_map.values()},
+    }
+
+def resolve_issue(match, index):
+    """Return (text, url) for a matched issue reference, or None if it points nowhere we know."""
+    key = index['issues'].get(match.group('issue'))
+    if not key:
+        return None
+    return key, f"{JIRA_URL}/browse/{key}"
+
+def resolve_page(match, index):
+    """Return (text, url) for a matched wiki link, or None if it points nowhere we know."""
+    target = match.group('page').replace('\\', '')
+    target, _, label = target.partition('|')
+    page_title = target.split('#', 1)[0]
+    found = index['pages'].get(normalize_wiki_title(page_title))
+    if not found:
+        return None
+    title, page_id = found
+    return (label.strip() or title), f"{CONFLUENCE_URL}/pages/viewpage.action?pageId={page_id}"
+
+def has_references(text, page_pattern):
+    return bool(ISSUE_PATTERN.search(text) or page_pattern.search(text))
+
+def iter_issue_matches(text):
+    """Yield the ISSUE_PATTERN matches that are real references.
+
+    A match glued to a word ("abc#12") is skipped unless it directly follows another reference
+    ("#12#13"), and so is one inside a URL ("http://host/#12").
+    """
+    url_spans = [m.span() for m in URL_PATTERN.finditer(text)] if '://' in text else []
+    previous_end = None
+    for match in ISSUE_PATTERN.finditer(text):
+        start = match.start()
+        glued = start > 0 and (text[start - 1].isalnum() or text[start - 1] == '_')
+        if glued and start != previous_end:
+            continue
+        if any(url_start <= start < url_end for url_start, url_end in url_spans):
+            continue
+        previous_end = match.end()
+        yield match
+
+def split_references(text, index, page_pattern):
+    """Split text into (text, url) pieces; url is None for text that is kept as-is."""
+    # Resolved wiki links win; issue references are only rewritten outside of them
+    spans = []
+    for match in page_pattern.finditer(text):
+        resolved = resolve_page(match, index)
+        if resolved:
+            spans.append((match.start(), match.end(), resolved))
+    page_spans = list(spans)
+    for match in iter_issue_matches(text):
+        if any(start <= match.start() < end for start, end, _ in page_spans):
+            continue
+        resolved = resolve_issue(match, index)
+        if resolved:
+            spans.append((match.start(), match.end(), resolved))
+    if not spans:
+        return None
+
+    pieces = []
+    last = 0
+    for start, end, resolved in sorted(spans, key=lambda span: span[0]):
+        if start > last:
+            pieces.append((text[last:start], None))
+        pieces.append(resolved)
+        last = end
+    if last < len(text):
+        pieces.append((text[last:], None))
+    return pieces
+
+# === Jira (ADF descriptions) ===
+
+def is_rewritable_text(node):
+    return node.get('type') == 'text' and not any(m.get('type') in ('link', 'code') for m in node.get('marks', []))
+
+def iter_adf_text(node):
+    """Yield the text of every node rewrite_adf_node would look at."""
+    for child in node.get('content') or []:
+        if is_rewritable_text(child):
+            yield child.get('text', '')
+        elif child.get('type') not in ('text', 'codeBlock'):
+            yield from iter_adf_text(child)
+
+def rewrite_adf_node(node, index):
+    changed = False
+    children = node.get('content')
+    if not isinstance(children, list):
+        return False
+    new_children = []
+    for child in children:
+        marks = child.get('marks', [])
+        if is_rewritable_text(child):
+            pieces = split_references(child.get('text', ''), index, JIRA_PAGE_PATTERN)
+            if pieces:
+                for text, url in pieces:
+                    piece = {"type": "text", "text": text}
+                    piece_marks = marks + ([{"type": "link", "attrs": {"href": url}}] if url else [])
+                    if piece_marks:
+                        piece["marks"] = piece_marks
+                    new_children.append(piece)
+                changed = True
+                continue
+        elif child.get('type') != 'codeBlock':
+            changed = rewrite_adf_node(child, index) or changed
+        new_children.append(child)
+    node['content'] = new_children
+    return changed
+
+def iter_jira_issues():
+    next_page_token = None
+    while True:
+        params = {
+            "jql": f"project = {JIRA_PROJECT_KEY} ORDER BY key",
+            "fields": "description",
+            "maxResults": PAGE_SIZE,
+        }
+        if next_page_token:
+            params["nextPageToken"] = next_page_token
+        resp = requests.get(f"{JIRA_URL}/rest/api/3/search/jql", auth=auth, params=params)
+        if resp.status_code != 200:
+            print(f"❌ Failed to search Jira issues: {resp.text}")
+            return
+        data = resp.json()
+        for issue in data.get("issues", []):
+            yield issue
+        next_page_token = data.get("nextPageToken")
+        if data.get("isLast", True) or not next_page_token:
+            return
+
+def rewrite_jira_issues(index):
+    scanned = updated = 0
+    for issue in iter_jira_issues():
+        scanned += 1
+        if issue['key'] not in index['jira_keys']:
+            continue
+        description = issue.get("fields", {}).get("description")
+        # Cheap pre-filter on the document's text before rebuilding the ADF tree
+        if not description or not has_references('\n'.join(iter_adf_text(description)), JIRA_PAGE_PATTERN):
+            continue
+        if not rewrite_adf_node(description, index):
+            continue
+        resp = requests.put(
+            f"{JIRA_URL}/rest/api/3/issue/{issue['key']}",
+            auth=auth,
+            headers={"Content-Type": "application/json"},
+            params={"notifyUsers": "false"},
+            json={"fields": {"description": description}}
+        )
+        if resp.status_code in (200, 204):
+            updated += 1
+            print(f"🔗 Rewrote references in Jira issue {issue['key']}")
+        else:
+            print(f"⚠️ Failed to update Jira issue {issue['key']}: {resp.text}")
+    print(f"✅ Jira: scanned {scanned} issues, updated {updated}.")
+
+# === Confluence (storage format pages) ===
+
+def iter_storage_segments(body):
+    """Yield (segment, rewritable) for a storage body; only text outside tags and SKIP_TAGS is rewritable."""
+    skip_depth = 0
+    for part in re.split(r'(<!\[CDATA\[.*?\]\]>|<[^>]+>)', body, flags=re.DOTALL):
+        if part.startswith('<'):
+            tag = re.match(r'</?([\w:-]+)', part)
+            if tag and tag.group(1).lower() in SKIP_TAGS and not part.endswith('/>'):
+                skip_depth += -1 if part.startswith('</') else 1
+                skip_depth = max(skip_depth, 0)
+            yield part, False
+        else:
+            yield part, not skip_depth
+
+def storage_text(body):
+    return '\n'.join(part for part, rewritable in iter_storage_segments(body) if rewritable)
+
+def rewrite_storage_body(body, index):
+    out = []
+    changed = False
+    for part, rewritable in iter_storage_segments(body):
+        # Pages never went through preprocess_redmine_plaintext, so only "[[Page]]" is a wiki link
+        pieces = split_references(part, index, WIKI_LINK_PATTERN) if rewritable else None
+        if not pieces:
+            out.append(part)
+            continue
+        for text, url in pieces:
+            if url:
+                # text came from the page itself (already escaped) or from our index (needs escaping)
+                out.append(f'<a href="{html.escape(url)}">{html.escape(html.unescape(text))}</a>')
+            else:
+                out.append(text)
+        changed = True
+    return ''.join(out) if changed else None
+
+def iter_confluence_pages():
+    start = 0
+    while True:
+        pages = confluence.get_all_pages_from_space(
+            CONFLUENCE_SPACE_KEY,
+            start=start,
+            limit=PAGE_SIZE,
+            expand='body.storage'
+        )
+        if not pages:
+            return
+        for page in pages:
+            yield page
+        # The server may cap the batch below PAGE_SIZE, so only an empty batch ends the scan
+        start += len(pages)
+
+def rewrite_confluence_pages(index):
+    scanned = updated = 0
+    for page in iter_confluence_pages():
+        scanned += 1
+        if str(page['id']) not in index['page_ids']:
+            continue
+        body = page.get('body', {}).get('storage', {}).get('value', '')
+        # Cheap pre-filter on the page's text before rebuilding the body
+        if not has_references(storage_text(body), WIKI_LINK_PATTERN):
+            continue
+        new_body = rewrite_storage_body(body, index)
+        if new_body is None:
+            continue
+        try:
+            confluence.update_page(
+                page['id'],
+                page['title'],
+                new_body,
+                representation='storage',
+                minor_edit=True
+            )
+            updated += 1
+            print(f"🔗 Rewrote references in Confluence page '{page['title']}'")
+        except Exception as e:
+            print(f"⚠️ Exception updating page '{page['title']}': {e}")
+    print(f"✅ Confluence: scanned {scanned} pages, updated {updated}.")
+
+def main():
+    index = build_link_index()
+    print(f"📇 Link index: {len(index['issues'])} issues, {len(index['pages'])} wiki pages")
+    if not index['issues'] and not index['pages']:
+        return
+    start = time.time()
+    rewrite_jira_issues(index)
+    rewrite_confluence_pages(index)
+    print(f"⏱️ Finished in {time.time() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()